@@ -11,6 +11,12 @@ This Flask server provides the same API as the original BaseHTTPServer but with:
 
 Usage:
     python3 flask_server.py [--host HOST] [--port PORT] [--audio-dir AUDIO_DIR]
+                            [--workers N] [--threads N] [--worker-class {auto,gthread,gevent}] [--debug]
+
+When gunicorn is installed the server runs under gunicorn, using gevent workers
+(which stream to many slow clients from one event loop) when gevent is
+installed and threaded workers otherwise;
+otherwise (or with --debug) it falls back to the Flask development server.
 
 Example:
     python3 flask_server.py --host 0.0.0.0 --port 8000 --audio-dir ../test_data
@@ -26,18 +32,151 @@ this case.
 """
 
 import os
+import re
 import sys
 import json
 import wave
 import time
 import struct
 import argparse
+import hashlib
+import importlib.util
 import threading
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
-from flask import Flask, jsonify, request, Response, render_template_string
-from urllib.parse import parse_qs
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from email.utils import formatdate
+from flask import Flask, jsonify, request, Response
+from werkzeug.exceptions import HTTPException
+from werkzeug.wsgi import FileWrapper
+from urllib.parse import parse_qs, quote
+from typing import Optional, Dict, Any, Tuple, NamedTuple, Literal
+
+try:
+    import orjson  # Optional C JSON encoder, several times faster than json
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np  # Optional, only needed for ?quality=low transcoding
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+# Background listener that writes queued log records to stderr
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Default disk read size for streaming (256 KiB)
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# Smallest manifest chunk, bounding the chunk list to one entry per 64 KiB of audio
+MIN_MANIFEST_CHUNK = 64 * 1024
+
+# Directory under the audio directory holding transcoded copies of tracks
+TRANSCODE_CACHE_DIR = '.cache'
+
+# Frames decoded per block while transcoding (even, so sample pairs never split)
+_TRANSCODE_BLOCK_FRAMES = 64 * 1024
+
+# gthread workers serve one connection per thread, and paced embedded streams
+# hold theirs for minutes; keep plenty free for control requests
+DEFAULT_GUNICORN_THREADS = 64
+
+# Supported audio file extensions and the content type each one is served with
+SUPPORTED_AUDIO_TYPES = {
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.flac': 'audio/flac',
+}
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def loads_json(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed; raises ValueError on bad input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def transcode_low_quality(src: Path, dst: Path):
+    """Write an 8-bit mono copy of a 16-bit PCM WAV file, halving rates above 22.05 kHz.
+
+    Raises wave.Error or ValueError for files that cannot be transcoded.
+    """
+    with wave.open(str(src), 'rb') as reader:
+        channels = reader.getnchannels()
+        rate = reader.getframerate()
+        if reader.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV files can be transcoded")
+        decimate = rate > 22050
+        
+        # Write next to the destination and rename, so readers never see a partial file
+        tmp_path = dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with wave.open(str(tmp_path), 'wb') as writer:
+                writer.setnchannels(1)
+                writer.setsampwidth(1)
+                writer.setframerate(rate // 2 if decimate else rate)
+                
+                while True:
+                    frames = reader.readframes(_TRANSCODE_BLOCK_FRAMES)
+                    if not frames:
+                        break
+                    
+                    # Down-mix to mono
+                    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels).mean(axis=1)
+                    if decimate:
+                        # Average sample pairs: a crude low-pass filter and 2:1 decimation in one step
+                        samples = samples[:len(samples) // 2 * 2].reshape(-1, 2).mean(axis=1)
+                    
+                    # 8-bit WAV PCM is unsigned and centred on 128
+                    writer.writeframes((samples / 256 + 128).clip(0, 255).astype(np.uint8).tobytes())
+            
+            os.replace(tmp_path, dst)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+def run_blocking(func, *args):
+    """Run CPU-heavy work, off the event loop when a gevent worker has patched threading"""
+    if 'gevent' in sys.modules:
+        import gevent
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return gevent.get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+PlaybackState = Literal['playing', 'paused', 'stopped']
+
+class TrackMeta(NamedTuple):
+    """Cached file system metadata for a single track"""
+    path: Path
+    size: int
+    mtime: float
+    mimetype: str
+    etag: str           # Unquoted entity tag derived from size and mtime
+    last_modified: str  # mtime formatted as an HTTP date
+    
+    @classmethod
+    def from_stat(cls, path: Path, st: os.stat_result, mimetype: str) -> 'TrackMeta':
+        """Build metadata, including cache validators, from a stat() result"""
+        return cls(path, st.st_size, st.st_mtime, mimetype,
+                   f"{st.st_size:x}-{int(st.st_mtime):x}", formatdate(st.st_mtime, usegmt=True))
+
+@dataclass(frozen=True)
+class StatusSnap:
+    """Immutable snapshot of the playback state served to read-only endpoints"""
+    status: str
+    track: Optional[str]
+    volume: int
+    position: int
+    available_tracks: tuple
 
 class AudioStreamServer:
     """Manages audio streaming state and control.
@@ -46,61 +185,152 @@ class AudioStreamServer:
 
     - audio_dir: Directory containing audio files
     - current_track: Currently playing track name
-    - is_playing: Boolean indicating if audio is currently playing
-    - is_paused: Boolean indicating if audio playback is paused
+    - state: Playback state, one of 'playing', 'paused' or 'stopped'
+    - is_playing: Boolean indicating if audio is currently playing (derived from state)
+    - is_paused: Boolean indicating if audio playback is paused (derived from state)
     - volume: Current playback volume (0-100)
     - position: Current playback position in bytes
-    - chunk_size: Size of audio chunks for streaming (default 1024 bytes)
-    - lock: Thread lock for synchronizing access to shared state
-    - available_tracks: List of available audio tracks in the audio directory
+    - chunk_size: Disk read block size for streaming (default 256 KiB); client
+      packets are served from this buffer instead of one read() per packet
+    - _state_lock: Guards state transitions together with current_track and position
+    - _publish_lock: Serializes building and swapping in status snapshots
+    - available_tracks: Sorted tuple of available audio tracks, for display
+    - track_meta: Cached TrackMeta (path, size, mtime, mimetype, validators) keyed by track name
+    - check_mtime: Re-stat cached tracks on lookup and refresh them when they change
+    - mirrors: Base URLs of other servers hosting the same audio files
     """
     
-    def __init__(self, audio_dir: str):
+    def __init__(self, audio_dir: str, check_mtime: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 mirrors: Tuple[str, ...] = ()):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        
         self.audio_dir = Path(audio_dir)
+        self.check_mtime = check_mtime
+        self.mirrors = tuple(m.rstrip('/') for m in mirrors)
         self.current_track: Optional[str] = None
-        self.is_playing = False
-        self.is_paused = False
-        self.volume = 100  # 0-100
+        self.state: PlaybackState = 'stopped'  # Transitions happen under _state_lock
+        self.volume = 100  # 0-100, single atomic store, no lock needed
         self.position = 0  # Current position in bytes
-        self.chunk_size = 1024  # Bytes per chunk for streaming
-        self.lock = threading.Lock()
+        self.chunk_size = chunk_size  # Bytes per disk read for streaming
+        self._state_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        
+        # Rendered index page keyed by the track list it was rendered for
+        self._index_cache: Optional[Tuple[tuple, str]] = None
+        
+        # SHA-256 of track contents keyed by name, stored with the (size, mtime) hashed
+        self._hash_cache: Dict[str, Tuple[int, float, str]] = {}
+        
+        # Per-track locks so concurrent requests for one track transcode it once,
+        # without making requests for other tracks wait
+        self._transcode_locks: Dict[str, threading.Lock] = {}
         
         # Discover available audio files
-        self.available_tracks = self._discover_audio_files()
-        print(f"Found {len(self.available_tracks)} audio files:")
+        self.track_meta: Dict[str, TrackMeta] = self._discover_audio_files()
+        self.available_tracks = tuple(sorted(self.track_meta))
+        self._tracks_set = frozenset(self.track_meta)  # O(1) membership checks
+        log.info("Found %d audio files:", len(self.available_tracks))
         for track in self.available_tracks:
-            print(f"  - {track}")
+            log.info("  - %s", track)
+        
+        self._tracks_json = dumps_json({"tracks": self.available_tracks})
+        self._publish_status()
     
-    def _discover_audio_files(self):
-        """Find all supported audio files in the audio directory"""
-        supported_extensions = {'.wav', '.mp3', '.flac'}
-        audio_files = []
+    def _discover_audio_files(self) -> Dict[str, TrackMeta]:
+        """Find all supported audio files in the audio directory and cache their metadata"""
+        audio_files: Dict[str, TrackMeta] = {}
+        self._index_cache = None  # Track list may change, re-render the index page
         
         if not self.audio_dir.exists():
-            print(f"Warning: Audio directory '{self.audio_dir}' does not exist")
+            log.warning("Audio directory '%s' does not exist", self.audio_dir)
             return audio_files
         
-        for file_path in self.audio_dir.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                audio_files.append(file_path.name)
+        for entry in self._scan_files(self.audio_dir):
+            mimetype = SUPPORTED_AUDIO_TYPES.get(os.path.splitext(entry.name)[1].lower())
+            if mimetype:
+                # Only matching files are stat()ed; everything else is filtered on the name
+                st = entry.stat()
+                audio_files[entry.name] = TrackMeta.from_stat(Path(entry.path), st, mimetype)
+        
+        return audio_files
+    
+    def _scan_files(self, directory: Path):
+        """Recursively yield file entries using os.scandir.
+
+        DirEntry.is_dir()/is_file() reuse the d_type reported by readdir, so
+        walking the tree does not stat() every node. Directory symlinks are
+        not followed to avoid cycles, and hidden directories (including the
+        transcode cache) are skipped. Directories that cannot be read are
+        skipped as well.
+        """
+        try:
+            entries = os.scandir(directory)
+        except PermissionError:
+            log.warning("Skipping unreadable directory '%s'", directory)
+            return
         
-        return sorted(audio_files)
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith('.'):
+                        continue
+                    yield from self._scan_files(entry.path)
+                elif entry.is_file():
+                    yield entry
+    
+    @property
+    def is_playing(self) -> bool:
+        """True while audio is playing"""
+        return self.state == 'playing'
+    
+    @property
+    def is_paused(self) -> bool:
+        """True while playback is paused"""
+        return self.state == 'paused'
+    
+    def _build_snapshot(self) -> StatusSnap:
+        """Capture the current state"""
+        # state, current_track and position change together; never publish half an update
+        with self._state_lock:
+            return StatusSnap(
+                status=self.state,
+                track=self.current_track,
+                volume=self.volume,
+                position=self.position,
+                available_tracks=self.available_tracks
+            )
+    
+    def _publish_status(self):
+        """Swap in a new snapshot and its pre-serialized JSON.
+
+        Every writer publishes after its own store, and publishing is
+        serialized, so the last snapshot always reflects the latest writes.
+        """
+        with self._publish_lock:
+            snap = self._build_snapshot()
+            self._status_json = dumps_json(snap.__dict__)
+            self._snap = snap
     
     def get_status(self) -> Dict[str, Any]:
         """Get current server status"""
-        with self.lock:
-            return {
-                "status": "playing" if self.is_playing else "paused" if self.is_paused else "stopped",
-                "track": self.current_track,
-                "volume": self.volume,
-                "position": self.position,
-                "available_tracks": self.available_tracks
-            }
+        # Lock-free: writers swap in a new snapshot and attribute reads are atomic
+        return dict(self._snap.__dict__)
+    
+    @property
+    def status_json(self) -> bytes:
+        """Current status serialized as JSON, rebuilt only when state changes"""
+        return self._status_json
+    
+    @property
+    def tracks_json(self) -> bytes:
+        """Track list serialized as JSON, rebuilt only on discovery"""
+        return self._tracks_json
     
     def play(self, track: Optional[str] = None) -> Dict[str, Any]:
         """Start playing audio"""
-        with self.lock:
-            if track and track in self.available_tracks:
+        with self._state_lock:
+            if track and track in self._tracks_set:
                 self.current_track = track
                 self.position = 0
             
@@ -110,61 +340,131 @@ class AudioStreamServer:
                 else:
                     return {"status": "error", "message": "No tracks available"}
             
-            self.is_playing = True
-            self.is_paused = False
-            
-            return {
-                "status": "playing", 
-                "track": self.current_track,
-                "message": f"Started playing {self.current_track}"
-            }
+            self.state = 'playing'
+            current_track = self.current_track
+        
+        self._publish_status()
+        return {
+            "status": "playing", 
+            "track": current_track,
+            "message": f"Started playing {current_track}"
+        }
     
     def pause(self) -> Dict[str, Any]:
         """Pause audio playback"""
-        with self.lock:
-            if self.is_playing:
-                self.is_playing = False
-                self.is_paused = True
-                return {"status": "paused", "message": "Playback paused"}
-            else:
+        with self._state_lock:
+            # Check and transition atomically so a concurrent stop() is not overwritten
+            if self.state != 'playing':
                 return {"status": "error", "message": "Not currently playing"}
+            self.state = 'paused'
+        
+        self._publish_status()
+        return {"status": "paused", "message": "Playback paused"}
     
     def stop(self) -> Dict[str, Any]:
         """Stop audio playback"""
-        with self.lock:
-            self.is_playing = False
-            self.is_paused = False
+        with self._state_lock:
+            self.state = 'stopped'
             self.position = 0
-            return {"status": "stopped", "message": "Playback stopped"}
+        
+        self._publish_status()
+        return {"status": "stopped", "message": "Playback stopped"}
     
     def set_volume(self, volume: int) -> Dict[str, Any]:
         """Set playback volume"""
-        with self.lock:
-            if 0 <= volume <= 100:
-                self.volume = volume
-                return {"status": "ok", "volume": self.volume, "message": f"Volume set to {volume}%"}
-            else:
-                return {"status": "error", "message": "Volume must be between 0 and 100"}
+        if 0 <= volume <= 100:
+            self.volume = volume
+            self._publish_status()
+            return {"status": "ok", "volume": volume, "message": f"Volume set to {volume}%"}
+        else:
+            return {"status": "error", "message": "Volume must be between 0 and 100"}
+    
+    def get_track_meta(self, track_name: str) -> Optional[TrackMeta]:
+        """Get cached metadata for a track, refreshing it if the file changed on disk"""
+        meta = self.track_meta.get(track_name)
+        if meta is None or not self.check_mtime:
+            return meta
+        
+        try:
+            st = meta.path.stat()
+        except OSError:
+            return None  # File disappeared since discovery
+        
+        if st.st_mtime != meta.mtime or st.st_size != meta.size:
+            meta = TrackMeta.from_stat(meta.path, st, meta.mimetype)
+            self.track_meta[track_name] = meta
+        return meta
+    
+    def get_track_hash(self, track_name: str, meta: TrackMeta) -> str:
+        """Get the SHA-256 of a track, hashing the file only when it changed"""
+        cached = self._hash_cache.get(track_name)
+        if cached and cached[:2] == (meta.size, meta.mtime):
+            return cached[2]
+        
+        digest = hashlib.sha256()
+        with open(meta.path, 'rb') as audio_file:
+            while True:
+                block = audio_file.read(self.chunk_size)
+                if not block:
+                    break
+                digest.update(block)
+        
+        self._hash_cache[track_name] = (meta.size, meta.mtime, digest.hexdigest())
+        return digest.hexdigest()
+    
+    def get_low_quality_meta(self, track_name: str, meta: TrackMeta) -> TrackMeta:
+        """Get metadata for the low quality copy of a track, transcoding it on first use.
+
+        Copies live in TRANSCODE_CACHE_DIR and carry the source file's mtime,
+        so a copy is reused until the source changes.
+        """
+        cache_path = self.audio_dir / TRANSCODE_CACHE_DIR / f"{track_name}.lowq.wav"
+        
+        # Fresh copies are served without taking any lock
+        st = self._fresh_copy_stat(cache_path, meta)
+        if st is None:
+            # setdefault is atomic, so every caller gets the same lock for a track
+            with self._transcode_locks.setdefault(track_name, threading.Lock()):
+                st = self._fresh_copy_stat(cache_path, meta)  # Another request may have finished it
+                if st is None:
+                    log.info("Transcoding %s to low quality", track_name)
+                    cache_path.parent.mkdir(exist_ok=True)
+                    run_blocking(transcode_low_quality, meta.path, cache_path)
+                    os.utime(cache_path, (meta.mtime, meta.mtime))
+                    st = cache_path.stat()
+        
+        return TrackMeta.from_stat(cache_path, st, 'audio/wav')
+    
+    def _fresh_copy_stat(self, cache_path: Path, meta: TrackMeta) -> Optional[os.stat_result]:
+        """stat() a transcoded copy, or None if it is missing or older than its source"""
+        try:
+            st = cache_path.stat()
+        except FileNotFoundError:
+            return None
+        return st if st.st_mtime == meta.mtime else None
     
     def get_track_path(self, track_name: str) -> Optional[Path]:
         """Get full path for a track"""
-        if track_name in self.available_tracks:
-            return self.audio_dir / track_name
-        return None
+        meta = self.track_meta.get(track_name)
+        return meta.path if meta else None
 
 # Global audio server instance
 audio_server = None
 
+# Amount of a stream to ask the kernel to start reading before the first packet
+_INITIAL_PREFETCH = 8 * 1024 * 1024
+
+# Single byte range, e.g. "bytes=100-199", "bytes=100-" or "bytes=-500"
+_RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
 # Create Flask app
 app = Flask(__name__)
 
 # Configure Flask for embedded clients
 app.config['JSON_SORT_KEYS'] = False
 
-@app.route('/')
-def index():
-    """Serve basic web interface"""
-    html_template = '''
+# Web interface template, compiled once at import instead of on every request
+INDEX_HTML = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -204,38 +504,70 @@ def index():
             <div class="method">POST /api/volume</div>
             <p>Set volume. JSON body: {"volume": 75}</p>
         </div>
+        <div class="endpoint">
+            <div class="method">GET /api/manifest?track=filename.wav</div>
+            <p>Size, hash, byte ranges and mirrors for fetching a track over parallel Range requests</p>
+        </div>
         <div class="endpoint">
             <div class="method">GET /audio/stream</div>
-            <p>Stream audio data with chunked encoding</p>
+            <p>Stream audio data. Optional query: track=filename.wav, chunk_size=N for paced packet streaming,
+               quality=low for 8-bit mono WAV</p>
         </div>
     </body>
     </html>
-    '''
+'''
+_INDEX_TEMPLATE = app.jinja_env.from_string(INDEX_HTML)
+
+@app.route('/')
+def index():
+    """Serve basic web interface"""
     status = audio_server.get_status()
-    return render_template_string(html_template, tracks=status['available_tracks'])
+    tracks = status['available_tracks']
+    
+    # Re-render only when the track list changes
+    cached = audio_server._index_cache
+    if cached is None or cached[0] != tracks:
+        cached = (tracks, _INDEX_TEMPLATE.render(tracks=tracks))
+        audio_server._index_cache = cached
+    
+    return Response(cached[1], mimetype='text/html')
 
 @app.route('/api/status', methods=['GET'])
 def api_status():
     """Get server status"""
     try:
-        status = audio_server.get_status()
-        return jsonify(status), 200
+        return Response(audio_server.status_json, status=200, mimetype='application/json')
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def read_json_body() -> Dict[str, Any]:
+    """Parse the request body as a JSON object in one pass.
+
+    Skips Werkzeug's content-type sniffing and cached request.json property.
+    Returns an empty dict for an empty body and raises ValueError when the body
+    is not a JSON object.
+    """
+    data = request.get_data(cache=False)
+    if not data:
+        return {}
+    body = loads_json(data)
+    if not isinstance(body, dict):
+        raise ValueError("JSON body must be an object")
+    return body
+
 @app.route('/api/play', methods=['POST'])
 def api_play():
     """Start playing audio"""
     try:
-        track = None
-        if request.is_json and request.json:
-            track = request.json.get('track')
+        try:
+            track = read_json_body().get('track')
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid JSON body"}), 400
+        if track is not None and not isinstance(track, str):
+            return jsonify({"status": "error", "message": "Track must be a string"}), 400
         
         result = audio_server.play(track)
         
-        # Longer delay to ensure response is fully sent before connection closes
-        time.sleep(0.1)
-        
         if result.get('status') == 'error':
             return jsonify(result), 400
         else:
@@ -249,7 +581,6 @@ def api_pause():
     """Pause audio playback"""
     try:
         result = audio_server.pause()
-        time.sleep(0.1)  # Longer delay for embedded clients
         
         if result.get('status') == 'error':
             return jsonify(result), 400
@@ -264,7 +595,6 @@ def api_stop():
     """Stop audio playback"""
     try:
         result = audio_server.stop()
-        time.sleep(0.1)  # Longer delay for embedded clients
         return jsonify(result), 200
         
     except Exception as e:
@@ -274,10 +604,14 @@ def api_stop():
 def api_volume():
     """Set playback volume"""
     try:
-        if not request.is_json or not request.json:
+        try:
+            body = read_json_body()
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid JSON body"}), 400
+        if not body:
             return jsonify({"status": "error", "message": "JSON body required"}), 400
         
-        volume = request.json.get('volume')
+        volume = body.get('volume')
         if volume is None:
             return jsonify({"status": "error", "message": "Volume parameter required"}), 400
         
@@ -287,7 +621,6 @@ def api_volume():
             return jsonify({"status": "error", "message": "Volume must be a number"}), 400
         
         result = audio_server.set_volume(volume)
-        time.sleep(0.1)  # Longer delay for embedded clients
         
         if result.get('status') == 'error':
             return jsonify(result), 400
@@ -301,18 +634,195 @@ def api_volume():
 def api_tracks():
     """Get list of available tracks"""
     try:
-        status = audio_server.get_status()
-        return jsonify({"tracks": status['available_tracks']}), 200
+        return Response(audio_server.tracks_json, status=200, mimetype='application/json')
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def advise_sequential(fd: int, offset: int, length: int):
+    """Tell the kernel a byte range will be read front to back, and start
+    prefetching its beginning. No-op where posix_fadvise is unavailable."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, offset, min(_INITIAL_PREFETCH, length), os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass  # Advice only; some file systems reject it
+
+@app.route('/api/manifest', methods=['GET'])
+def api_manifest():
+    """Describe a track so clients can fetch it with parallel Range requests across mirrors"""
+    try:
+        track_name = request.args.get('track')
+        if not track_name:
+            return jsonify({"status": "error", "message": "Track parameter required"}), 400
+        
+        try:
+            chunk = int(request.args.get('chunk', max(audio_server.chunk_size, MIN_MANIFEST_CHUNK)))
+        except ValueError:
+            return jsonify({"status": "error", "message": "Chunk must be a number"}), 400
+        if chunk < MIN_MANIFEST_CHUNK:
+            return jsonify({"status": "error",
+                            "message": f"Chunk must be at least {MIN_MANIFEST_CHUNK} bytes"}), 400
+        
+        meta = audio_server.get_track_meta(track_name)
+        if not meta:
+            return jsonify({"status": "error", "message": f"Track '{track_name}' not found"}), 404
+        
+        stream_path = f"/audio/stream?track={quote(track_name)}"
+        mirrors = [request.host_url.rstrip('/') + stream_path]
+        mirrors.extend(mirror + stream_path for mirror in audio_server.mirrors)
+        
+        return jsonify({
+            "track": track_name,
+            "size": meta.size,
+            "mimetype": meta.mimetype,
+            "hash": f"sha256:{audio_server.get_track_hash(track_name, meta)}",
+            "chunks": [
+                {"offset": offset, "len": min(chunk, meta.size - offset)}
+                for offset in range(0, meta.size, chunk)
+            ],
+            "mirrors": mirrors
+        }), 200
+    
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+class BoundedFile:
+    """Read-only view of an open file that ends after ``length`` bytes.
+
+    Deliberately has no fileno(), so file wrappers fall back to calling read()
+    and cannot send past the end of the requested range.
+    """
+    
+    def __init__(self, audio_file, length: int):
+        self._file = audio_file
+        self._remaining = length
+    
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size) if size else b''
+        self._remaining -= len(data)
+        return data
+    
+    def close(self):
+        self._file.close()
+
+def file_wrapper_response(meta: TrackMeta, start: int, length: int, partial: bool) -> Response:
+    """Hand an open file to the WSGI server's file wrapper.
+
+    gunicorn recognises its own wrapper and sends the file with sendfile(2)
+    from the current offset, cut off at Content-Length, so both full and
+    partial responses skip userspace copies. Other servers (wsgiref, the
+    Werkzeug dev server) copy the whole file, so they get a reader bounded
+    to the requested range instead.
+    """
+    audio_file = open(meta.path, 'rb')
+    audio_file.seek(start)
+    if not request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        audio_file = BoundedFile(audio_file, length)
+    file_wrapper = request.environ.get('wsgi.file_wrapper', FileWrapper)
+    
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-cache',
+        'Content-Length': str(length),
+        'ETag': f'"{meta.etag}"',
+        'Last-Modified': meta.last_modified
+    }
+    if partial:
+        headers['Content-Range'] = f'bytes {start}-{start + length - 1}/{meta.size}'
+    
+    return Response(
+        file_wrapper(audio_file, audio_server.chunk_size),
+        status=206 if partial else 200,
+        mimetype=meta.mimetype,
+        headers=headers,
+        direct_passthrough=True
+    )
+
+def is_not_modified(meta: TrackMeta) -> bool:
+    """Check the request's cache validators against a track.
+
+    If-None-Match uses weak comparison, as RFC 9110 requires for GET, and
+    If-Modified-Since is only consulted when the client sent no If-None-Match.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(meta.etag)
+    if request.if_modified_since:
+        return request.if_modified_since.timestamp() >= int(meta.mtime)
+    return False
+
+def parse_byte_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' Range header into an inclusive (start, end) pair.
+
+    Returns None when no usable range was requested, including syntactically
+    invalid ones such as 'bytes=5-1' which RFC 9110 says to ignore, and raises
+    ValueError when the range cannot be satisfied for a file of the given size.
+    """
+    if not range_header:
+        return None
+    
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None  # Malformed or multi-range requests fall back to the full file
+    
+    if match.group(1):
+        start = int(match.group(1))
+        if match.group(2):
+            end = int(match.group(2))
+            if end < start:
+                return None  # Invalid, not unsatisfiable: serve the full file
+        else:
+            end = file_size - 1
+    else:
+        # Suffix range: the last N bytes of the file
+        suffix = int(match.group(2))
+        if suffix == 0:
+            raise ValueError(f"Range '{range_header}' selects no bytes")
+        start = max(0, file_size - suffix)
+        end = file_size - 1
+    
+    if start >= file_size:
+        raise ValueError(f"Range '{range_header}' not satisfiable for {file_size} bytes")
+    
+    return start, min(end, file_size - 1)
+
+def requested_range(meta: TrackMeta) -> Optional[Tuple[int, int]]:
+    """Get the byte range to serve for a track, honoring If-Range.
+
+    A Range is only applied when If-Range is absent or still matches the
+    track, so a client resuming with a stale validator gets the whole new
+    file instead of bytes spliced from a different one. If-Range needs a
+    strong ETag match or the exact Last-Modified date.
+    """
+    if_range = request.headers.get('If-Range')
+    if if_range:
+        parsed = request.if_range
+        if parsed.etag is not None:
+            matches = not if_range.strip().startswith('W/') and parsed.etag == meta.etag
+        else:
+            matches = parsed.date is not None and parsed.date.timestamp() == int(meta.mtime)
+        if not matches:
+            return None
+    
+    return parse_byte_range(request.headers.get('Range'), meta.size)
+
 @app.route('/audio/stream', methods=['GET'])
 def audio_stream():
     """Stream audio data with packet-based chunked encoding for memory-efficient streaming"""
     try:
         # Get track parameter from query string
         track_name = request.args.get('track')
-        chunk_size = int(request.args.get('chunk_size', 256))  # Reduced from 1024 to 256 bytes for embedded clients
+        # Embedded clients ask for explicit packet sizes; everyone else gets the file at full speed
+        packet_mode = 'chunk_size' in request.args
+        try:
+            chunk_size = int(request.args.get('chunk_size', 256))  # Reduced from 1024 to 256 bytes for embedded clients
+        except ValueError:
+            return jsonify({"status": "error", "message": "Chunk size must be a number"}), 400
+        if chunk_size <= 0:
+            return jsonify({"status": "error", "message": "Chunk size must be positive"}), 400
         
         if not track_name:
             # Use current playing track or first available
@@ -322,99 +832,268 @@ def audio_stream():
         if not track_name:
             return jsonify({"status": "error", "message": "No track specified and none available"}), 400
         
-        track_path = audio_server.get_track_path(track_name)
-        if not track_path or not track_path.exists():
+        meta = audio_server.get_track_meta(track_name)
+        if not meta:
             return jsonify({"status": "error", "message": f"Track '{track_name}' not found"}), 404
         
-        print(f"Starting packet-based streaming of: {track_path} (chunk size: {chunk_size} bytes)")
+        # Optional down-mixed, requantized copy for clients that cannot use full quality PCM
+        quality = request.args.get('quality', 'high')
+        if quality == 'low':
+            if np is None:
+                return jsonify({"status": "error", "message": "Low quality streaming requires numpy"}), 501
+            if meta.mimetype != 'audio/wav':
+                return jsonify({"status": "error", "message": "Only WAV tracks can be transcoded"}), 415
+            try:
+                meta = audio_server.get_low_quality_meta(track_name, meta)
+            except (wave.Error, ValueError) as e:
+                return jsonify({"status": "error", "message": f"Cannot transcode '{track_name}': {e}"}), 415
+        elif quality != 'high':
+            return jsonify({"status": "error", "message": "Quality must be 'high' or 'low'"}), 400
+        
+        # Client already has this exact file
+        if is_not_modified(meta):
+            return Response(status=304, headers={'ETag': f'"{meta.etag}"', 'Last-Modified': meta.last_modified})
+        
+        track_path = meta.path
+        file_size = meta.size
+        try:
+            byte_range = requested_range(meta)
+        except ValueError:
+            return Response(status=416, headers={'Content-Range': f'bytes */{file_size}'})
+        
+        start, end = byte_range if byte_range else (0, file_size - 1)
+        length = end - start + 1
+        
+        if not packet_mode:
+            log.info("Starting zero-copy streaming of: %s (bytes %d-%d)", track_path, start, end)
+            return file_wrapper_response(meta, start, length, partial=byte_range is not None)
+        
+        log.info("Starting packet-based streaming of: %s (chunk size: %d bytes, bytes %d-%d)",
+                 track_path, chunk_size, start, end)
         
         def generate_audio_packets():
             """Generator function for streaming audio in small packets"""
             try:
-                with open(track_path, 'rb') as audio_file:
-                    # Read and send WAV header first
-                    wav_header = audio_file.read(44)  # Standard WAV header size
-                    if len(wav_header) >= 44:
+                # Packets are served from a chunk_size read buffer, so small
+                # embedded packets do not cost one read() syscall each. Plain
+                # reads also just come up short if the file is truncated while
+                # a slow stream is open.
+                with open(track_path, 'rb', buffering=audio_server.chunk_size) as audio_file:
+                    advise_sequential(audio_file.fileno(), start, length)
+                    audio_file.seek(start)
+                    remaining = length
+                    chunk_count = 0
+                    total_sent = 0
+                    
+                    # Read and send WAV header first when streaming from the top of the file
+                    if start == 0 and remaining >= 44:
+                        wav_header = audio_file.read(44)  # Standard WAV header size
                         yield wav_header
-                        print(f"Sent WAV header ({len(wav_header)} bytes)")
+                        remaining -= len(wav_header)
+                        total_sent += len(wav_header)
+                        log.debug("Sent WAV header (%d bytes)", len(wav_header))
                     
                     # Stream audio data in chunks
-                    chunk_count = 0
-                    total_sent = len(wav_header) if len(wav_header) >= 44 else 0
-                    
-                    while True:
-                        chunk = audio_file.read(chunk_size)
+                    while remaining > 0:
+                        chunk = audio_file.read(min(chunk_size, remaining))
                         if not chunk:
                             break
                         
                         yield chunk
                         chunk_count += 1
+                        remaining -= len(chunk)
                         total_sent += len(chunk)
                         
                         # Log every 10 chunks to reduce spam
                         if chunk_count % 10 == 0:
-                            print(f"Sent packet {chunk_count}: {len(chunk)} bytes (total: {total_sent} bytes)")
+                            log.debug("Sent packet %d: %d bytes (total: %d bytes)", chunk_count, len(chunk), total_sent)
                         
                         # Increased delay to prevent overwhelming the embedded client
                         time.sleep(0.05)  # 50ms between packets (was 10ms)
                     
-                    print(f"Streaming completed: {chunk_count} packets, {total_sent} total bytes")
+                    log.info("Streaming completed: %d packets, %d total bytes", chunk_count, total_sent)
                     
             except Exception as e:
-                print(f"Error during streaming: {e}")
+                log.error("Error during streaming: %s", e)
                 yield b''  # Send empty chunk to indicate end
         
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'no-cache',
+            'ETag': f'"{meta.etag}"',
+            'Last-Modified': meta.last_modified,
+            'X-Chunk-Size': str(chunk_size)
+        }
+        if byte_range:
+            # Partial content has a known length, so no chunked encoding
+            status_code = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+            headers['Content-Length'] = str(length)
+        else:
+            status_code = 200
+            headers['Transfer-Encoding'] = 'chunked'
+        
         # Return streaming response with chunked encoding
         response = Response(
             generate_audio_packets(),
-            mimetype='audio/wav',
-            headers={
-                'Cache-Control': 'no-cache',
-                'Connection': 'close',
-                'Transfer-Encoding': 'chunked',
-                'X-Chunk-Size': str(chunk_size)
-            }
+            status=status_code,
+            mimetype=meta.mimetype,
+            headers=headers
         )
         
-        print(f"Starting chunked streaming response for {track_name}")
+        log.info("Starting chunked streaming response for %s", track_name)
         return response
         
+    except HTTPException:
+        raise  # let Flask render the intended status
     except Exception as e:
-        print(f"Error in packet-based audio_stream: {e}")
+        log.error("Error in packet-based audio_stream: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def positive_int(value: str) -> int:
+    """argparse type for options that must be a positive integer"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def start_log_listener():
+    """Route log records through a queue drained by a background thread.
+
+    Request handlers only enqueue records, so a slow terminal or pipe never
+    blocks them. Must be called again in forked worker processes because the
+    listener thread does not survive fork().
+    """
+    global _log_listener
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+
+def run_gunicorn(host: str, port: int, workers: int, threads: int, worker_class: str = 'auto') -> bool:
+    """Serve the app with gunicorn.
+
+    worker_class 'gthread' uses a thread per connection; 'gevent' serves every
+    connection of a worker from one event loop, so many slow embedded clients
+    on paced packet streams cost a greenlet each instead of an OS thread.
+    'auto' picks gevent when it is installed and gthread otherwise. A paced
+    embedded stream occupies a connection for minutes, so gthread needs
+    enough threads to leave room for control requests next to open streams.
+
+    Returns False when gunicorn is not installed so the caller can fall back
+    to the Flask development server.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+    
+    has_gevent = importlib.util.find_spec('gevent') is not None
+    if worker_class == 'auto':
+        worker_class = 'gevent' if has_gevent else 'gthread'
+    elif worker_class == 'gevent' and not has_gevent:
+        log.warning("gevent is not installed, falling back to gthread workers")
+        worker_class = 'gthread'
+    
+    if workers > 1:
+        log.warning("Running %d workers: playback state is kept per process, so /api/play, "
+                    "/api/status and the other control endpoints may disagree between requests", workers)
+    
+    class StandaloneApplication(BaseApplication):
+        """Embeds gunicorn so the already initialized audio_server is shared with workers"""
+        
+        def __init__(self, application, options: Dict[str, Any]):
+            self.application = application
+            self.options = options
+            super().__init__()
+        
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
+    
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'worker_class': worker_class,
+        'threads': threads,  # Only used by gthread workers
+        # Long-lived audio streams must not be killed by the default 30s worker timeout
+        'timeout': 0,
+        # Keep idle client connections open so repeat streams skip the TCP handshake
+        'keepalive': 30,
+        # File wrapper responses from /audio/stream go out via sendfile(2)
+        'sendfile': True,
+        # Runs in each worker after gevent has monkey-patched threading and queue
+        'post_worker_init': lambda worker: start_log_listener(),
+    }
+    StandaloneApplication(app, options).run()
+    return True
+
 def main():
     global audio_server
     
     # Suppress Flask development server warning
     logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    start_log_listener()
     
     parser = argparse.ArgumentParser(description='Flask HTTP Audio Streaming Server')
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
     parser.add_argument('--port', type=int, default=8000, help='Port to bind to (default: 8000)')
     parser.add_argument('--audio-dir', default='../test_data', help='Directory containing audio files')
     parser.add_argument('--debug', action='store_true', help='Enable Flask debug mode')
+    parser.add_argument('--no-mtime-check', action='store_true',
+                        help='Trust cached track metadata instead of re-checking files on each stream')
+    parser.add_argument('--chunk-size', type=positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Disk read block size in bytes for streaming (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--mirror', action='append', default=[], metavar='URL',
+                        help='Base URL of another server with the same audio files (repeatable)')
+    parser.add_argument('--workers', type=positive_int, default=1,
+                        help='gunicorn worker processes; playback state is per process, so more '
+                             'than one is only safe for stream-only use (default: 1)')
+    parser.add_argument('--threads', type=positive_int, default=DEFAULT_GUNICORN_THREADS,
+                        help='Threads per gthread worker; each open stream holds one '
+                             f'(default: {DEFAULT_GUNICORN_THREADS})')
+    parser.add_argument('--worker-class', choices=('auto', 'gthread', 'gevent'), default='auto',
+                        help='gunicorn worker type; gevent serves streams from an event loop, '
+                             'auto uses it when installed (default: auto)')
     
     args = parser.parse_args()
     
     # Initialize audio server
-    audio_server = AudioStreamServer(args.audio_dir)
-    
-    print("\n" + "="*60)
-    print("MP3 Rewind Flask Audio Server Starting")
-    print("="*60)
-    print(f"Server URL: http://{args.host}:{args.port}")
-    print(f"Audio Directory: {Path(args.audio_dir).resolve()}")
-    print("Available at:")
-    print(f"  - Local: http://127.0.0.1:{args.port}")
+    audio_server = AudioStreamServer(args.audio_dir, check_mtime=not args.no_mtime_check,
+                                     chunk_size=args.chunk_size, mirrors=tuple(args.mirror))
+    
+    log.info("=" * 60)
+    log.info("MP3 Rewind Flask Audio Server Starting")
+    log.info("=" * 60)
+    log.info("Server URL: http://%s:%d", args.host, args.port)
+    log.info("Audio Directory: %s", Path(args.audio_dir).resolve())
+    log.info("Available at:")
+    log.info("  - Local: http://127.0.0.1:%d", args.port)
     if args.host != '127.0.0.1':
-        print(f"  - Network: http://{args.host}:{args.port}")
-    print("="*60)
-    print("Optimized for embedded HTTP clients (Zephyr)")
-    print("Press Ctrl+C to stop the server")
-    print()
+        log.info("  - Network: http://%s:%d", args.host, args.port)
+    log.info("=" * 60)
+    log.info("Optimized for embedded HTTP clients (Zephyr)")
+    log.info("Press Ctrl+C to stop the server")
     
     try:
+        # Prefer gunicorn; keep the Flask development server for debugging
+        # or when gunicorn is not installed
+        if not args.debug and run_gunicorn(args.host, args.port, args.workers, args.threads,
+                                            args.worker_class):
+            return
+        
         # Run Flask server with embedded-friendly configuration
         app.run(
             host=args.host,
@@ -424,10 +1103,12 @@ def main():
             use_reloader=False  # Disable reloader to avoid issues
         )
     except KeyboardInterrupt:
-        print("\nServer stopped by user")
+        log.info("Server stopped by user")
     except Exception as e:
-        print(f"Server error: {e}")
+        log.error("Server error: %s", e)
         sys.exit(1)
+    finally:
+        _log_listener.stop()
 
 if __name__ == "__main__":
     main()